@@ -19,13 +19,32 @@
 # Altitude: h_p for pressure altitude, h_rho for density altitude
 # Temperature: T
 
+import functools
 import math
 import numpy
+from typing import NamedTuple
 
 import pint
-ureg = pint.UnitRegistry()
+try:
+    # pint caches the parsed unit definitions on disk, which saves most of
+    # the registry's startup after the first run
+    ureg = pint.UnitRegistry(cache_folder=':auto:')
+except OSError:
+    # no writable cache directory
+    ureg = pint.UnitRegistry()
+pint.set_application_registry(ureg)
 Q_ = ureg.Quantity
 
+try:
+    from numba import guvectorize, njit
+except ImportError:
+    # numba is optional, without it the kernels just run as plain Python
+    guvectorize = None
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
 # Constants
 g = Q_(9.80665, 'm / s^2')
 R = Q_(53.355, 'ft/rankine')  # specific gas constant for air
@@ -34,68 +53,272 @@ rho0 = Q_(0.00237, 'slug / ft^3')
 p0 = Q_(29.921, 'inHg')
 lapseRate = Q_(0.001981, 'kelvin/ft')
 
+# Internally everything is a float in ft, lbf, slug, s and rankine. These
+# are the constants and conversion factors the float math needs, so pint
+# only gets involved where units come in and go out.
+_T0 = T0.m_as('rankine')
+_rho0 = rho0.m_as('slug / ft^3')
+_lapseRate = lapseRate.m_as('rankine / ft')
+_p0 = p0.m_as('lbf / ft^2')
+_pressureExponent = (1 / (lapseRate * R)).m_as('')
+_R = R.m_as('ft / rankine')
+_Rg = (R * g).m_as('ft^2 / s^2 / rankine')
+_fps_per_knot = Q_(1, 'knot').m_as('ft/s')
+_inHg_per_psf = Q_(1, 'lbf / ft^2').m_as('inHg')
+
 # Helpers
 def isQuantity(x):
     return isinstance(x, Q_)
 
+@functools.lru_cache(maxsize=256)
+def _conversionFactor(src, dst):
+    """ the multiplier from src to dst units, or None when the conversion
+    has an offset (degF, degC) and needs pint """
+    if Q_(0.0, src).m_as(dst) != 0:
+        return None
+    return Q_(1.0, src).m_as(dst)
+
 def lower(x, u):
-    if isQuantity(x):
-        return x.to(u).magnitude
+    # isQuantity() inlined, this is on every call's path
+    if isinstance(x, Q_):
+        factor = _conversionFactor(x.units, u)
+        if factor is None:
+            return x.m_as(u)
+        return x.magnitude * factor
     return x
 
+def _unitless(**units):
+    """ Decorator for a function on floats, so it takes Quantities too: the
+    named arguments are lowered to these units, e.g. @_unitless(h='ft'),
+    and the rest pass through. """
+    def decorator(f):
+        names = f.__code__.co_varnames[:f.__code__.co_argcount]
+        positional = [units.get(name) for name in names]
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            # arguments past f's own pass through, for f's own TypeError
+            args = [x if u is None else lower(x, u)
+                for x, u in zip(args, positional)] + list(args[len(positional):])
+            for k, v in kwargs.items():
+                if k in units:
+                    kwargs[k] = lower(v, units[k])
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
 # Atmosphere
+# The float kernels take ft and rankine and are compiled ahead of the
+# first call, since they're scalar only. The public functions convert
+# units once on the way in and out.
+@njit('f8(f8)', cache=True)
+def _standardTemperature(h):
+    return _T0 - h * _lapseRate
+
+@njit('f8(f8)', cache=True)
+def _standardPressure(h):
+    """ -> lbf/ft^2 """
+    return _p0 * (1 - _lapseRate * h / _T0) ** _pressureExponent
+
+@njit('f8(f8, f8)', cache=True)
+def _relativeDensity(h, T):
+    """ σ at pressure altitude h and temperature T """
+    return _standardPressure(h) / (_Rg * T) / _rho0
+
+_sigma0 = _p0 / (_Rg * _T0) / _rho0
+_absoluteZeroAltitude = _T0 / _lapseRate  # the 145457 ft of eq 1.10
+
+@njit('f8(f8)', cache=True)
+def _standardRelativeDensity(h):
+    """ σ of the standard atmosphere """
+    # Not just a shortcut: rho0 is rounded, so the formula gives 1.0028 here
+    if h == 0:
+        return 1.0
+    # [PoLA] eq 1.10, σ = (1 - h/145457)^4.25635, is _relativeDensity
+    # at the standard temperature worked out in closed form. Use this
+    # module's constants so both branches agree.
+    return _sigma0 * (1 - h / _absoluteZeroAltitude) ** (_pressureExponent - 1)
+
+@njit('f8(f8, f8, f8)', cache=True)
+def _tapeline(dh, h, T):
+    # [PoLA] eq F.4
+    return T / _standardTemperature(h) * dh
+
+def _loadNative():
+    """ The kernels built ahead of time by lowry_aot.py, which are cheaper to
+    call than a dispatcher, or None. A build that no longer matches this
+    file's kernels (an edited constant or formula, not rebuilt) is ignored. """
+    try:
+        import lowry_native
+    except ImportError:
+        return None
+    native = {}
+    for h, T in [(0.0, _T0), (5750.0, 504.67), (36000.0, 400.0)]:
+        probes = {
+            '_standardTemperature': (_standardTemperature, (h,)),
+            '_standardPressure': (_standardPressure, (h,)),
+            '_relativeDensity': (_relativeDensity, (h, T)),
+            '_standardRelativeDensity': (_standardRelativeDensity, (h,)),
+            '_tapeline': (_tapeline, (500.0, h, T)),
+        }
+        for name, (kernel, args) in probes.items():
+            f = getattr(lowry_native, name, None)
+            if f is None or not math.isclose(f(*args), kernel(*args), rel_tol=1e-12):
+                return None
+            native[name] = f
+    return native
+
+_native = _loadNative()
+if _native is not None:
+    globals().update(_native)
+
+def _sigma(h, T=None):
+    """ relativeDensity() on floats, T None for the standard atmosphere """
+    if T is None:
+        return _standardRelativeDensity(h)
+    return _relativeDensity(h, T)
+
+@_unitless(h='ft')
 def standardTemperature(h):
-    if h == Q_(0, 'ft'):
-        return T0
-    return (T0 - h * lapseRate).to('rankine')
+    """ h in ft if unitless """
+    return Q_(_standardTemperature(h), 'rankine')
 
+@_unitless(h='ft')
 def standardPressure(h):
-    if h == Q_(0, 'ft'):
-        return p0
-    return (p0 * (1 - lapseRate * h / T0) ** (1 / (lapseRate * R))).to('inHg')
+    """ h in ft if unitless """
+    return Q_(_standardPressure(h) * _inHg_per_psf, 'inHg')
 
+@_unitless(h='ft', T='rankine')
 def relativeDensity(h, T=None):
-    """ aka σ """
-    if h == Q_(0, 'ft') and T is None:
-        return 1
-    if T is None:
-        T = standardTemperature(h)
-    p = standardPressure(h)
-    rho = p / (R * g * T.to('rankine'))
-    return (rho / rho0).to('')
-
+    """ aka σ. h in ft and T in rankine if unitless """
+    return _sigma(h, T)
+
+# The ISA layers, for the standard atmosphere above the tropopause too.
+# Layers start at these geopotential altitudes, with these lapse rates
+# (T = T_b + L (h - h_b)); the base temperatures and pressures follow by
+# integrating up from the sea level constants.
+_isaAltitudes = Q_([0, 11000, 20000, 32000, 47000, 51000, 71000], 'm').m_as('ft')
+_isaLapseRates = numpy.array([-_lapseRate,
+    *Q_([0, 1.0, 2.8, 0, -2.8, -2.0], 'kelvin/km').m_as('rankine/ft')])
+
+def _isaLayer(dh, T_b, p_b, L):
+    """ temperature and pressure dh above the base of a layer, elementwise """
+    T = T_b + L * dh
+    with numpy.errstate(divide='ignore'):
+        p = numpy.where(L == 0, p_b * numpy.exp(-dh / (_R * T_b)), p_b * (T / T_b) ** (-1 / L / _R))
+    return T, p
+
+def _isaBases():
+    T_b, p_b = [_T0], [_p0]
+    for i in range(1, len(_isaAltitudes)):
+        T, p = _isaLayer(_isaAltitudes[i] - _isaAltitudes[i - 1], T_b[-1], p_b[-1], _isaLapseRates[i - 1])
+        T_b.append(T)
+        p_b.append(p)
+    return numpy.array(T_b), numpy.array(p_b)
+
+_isaTemperatures, _isaPressures = _isaBases()
+
+def relativeDensity_vec(h):
+    """ relativeDensity() of the standard atmosphere for an array of
+    altitudes (ft if unitless), through all the ISA layers """
+    h = numpy.asarray(lower(h, 'ft'), dtype=numpy.float64)
+    i = numpy.maximum(numpy.searchsorted(_isaAltitudes, h, side='right') - 1, 0)
+    T, p = _isaLayer(h - _isaAltitudes[i], _isaTemperatures[i], _isaPressures[i], _isaLapseRates[i])
+    # match relativeDensity()'s sea level shortcut
+    return numpy.where(h == 0, 1.0, p / (_Rg * T) / _rho0)
+
+def _density(h, T=None):
+    """ density() on floats, -> slug/ft^3 """
+    return _rho0 * _sigma(h, T)
+
+@_unitless(h_p='ft', T='rankine')
 def density(h_p, T=None):
-    """ without T, assumes standard atmosphere """
-    return (rho0 * relativeDensity(h_p, T)).to('slug / ft^3')
+    """ without T, assumes standard atmosphere. h_p in ft and T in rankine
+    if unitless """
+    return Q_(_density(h_p, T), 'slug / ft^3')
 
 # Aviation
+def _dropoff(sigma, C):
+    """ dropoffFactor from σ """
+    return (sigma - C) / (1 - C)
+
+@_unitless(h_p='ft', T='rankine')
 def dropoffFactor(h_p, T=None, C=0.12):
-    return (relativeDensity(h_p, T) - C) / (1 - C)
+    """ h_p in ft and T in rankine if unitless """
+    return _dropoff(_sigma(h_p, T), C)
 
+@_unitless(VC='knots', h_p='ft', T='rankine')
 def tas(VC, h_p, T=None):
-    return (VC / math.sqrt(relativeDensity(h_p, T))).to('knots')
+    """ VC in knots, h_p in ft and T in rankine if unitless """
+    return Q_(VC / math.sqrt(_sigma(h_p, T)), 'knots')
 
+@_unitless(V='knots', h_p='ft', T='rankine')
 def cas(V, h_p, T=None):
-    return (V * math.sqrt(relativeDensity(h_p, T))).to('knots')
+    """ V in knots, h_p in ft and T in rankine if unitless """
+    return Q_(V * math.sqrt(_sigma(h_p, T)), 'knots')
 
 def tapeline(dh_p, h_p, T=None):
     """ dh_p is pressure altitude delta, h_p is average pressure altitude """
     if T is None:
         return dh_p
+    # Only the scalar factor goes through the kernel, so dh_p can be an
+    # array, and keeps its units
     # [PoLA] eq F.4
-    return (T.to('rankine') / standardTemperature(h_p)) * dh_p
+    return dh_p * (lower(T, 'rankine') / _standardTemperature(lower(h_p, 'ft')))
 
+@_unitless(V='ft/s', dh='ft', dt='s')
 def flightAngle(V, dh, dt):
-    """ expects true airspeed, tapeline dh """
+    """ expects true airspeed, tapeline dh. V in ft/s, dh in ft and dt in s
+    if unitless, so any consistent units do """
     # [Bootstrap] eq 3
-    return Q_(math.asin(dh / (V * dt)), 'radian').to('degree')
+    return Q_(math.degrees(math.asin(dh / (V * dt))), 'degree')
+
+@_unitless(h_p='ft', T='rankine', V='ft/s', dh_p='ft', dt='s')
+def climbSegment(h_p, T, V, dh_p, dt):
+    """ tapeline() and flightAngle() together, for a climb or descent of
+    dh_p pressure altitude in dt at true airspeed V, about h_p -> (dh, γ).
+    h_p and dh_p in ft, T in rankine, V in ft/s and dt in s if unitless """
+    dh = dh_p if T is None else _tapeline(dh_p, h_p, T)
+    gamma = math.asin(dh / (V * dt))
+    return Q_(dh, 'ft'), Q_(math.degrees(gamma), 'degree')
 
 # The Bootstrap Method
+@njit('UniTuple(f8, 2)(f8, f8, f8, f8, f8, f8, f8)', cache=True)
+def _dragFit(S, A, W, sigma, Vbg, dh, dt):
+    """ C_D0 and e from a glide at Vbg, descending tapeline dh in dt """
+    # [Bootstrap] eq 3
+    sin_bg = dh / (Vbg * dt)
+    cos_bg = math.sqrt(1 - sin_bg * sin_bg)
+
+    # [PoLA] eq 9.41
+    # I think there's a sign error; eq 9.41 uses -W but that gives the wrong sign.
+    rho = _rho0 * sigma
+    C_D0 = W * sin_bg / (rho * S * Vbg * Vbg)
+    # tan² = sin²/cos²
+    e = 4 * C_D0 * cos_bg * cos_bg / (math.pi * A * sin_bg * sin_bg)
+    return C_D0, e
+
+@njit('UniTuple(f8, 2)(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8)', cache=True)
+def _thrustFit(S, A, d, M0, C_D0, e, W, sigma, phi, Vx, V_M):
+    """ b and m from climbs at Vx and V_M """
+    rho = _rho0 * sigma
+    piEA = math.pi * e * A
+
+    # [Bootstrap] eq 8, [PoLA] eq 7.1
+    b = S * C_D0 / (2 * d * d) - (
+        2 * W * W / (rho * rho * d * d * S * piEA * Vx ** 4)
+    )
+
+    # [Bootstrap] eq 9, but substituting πM0 = P0/2n0
+    m = (d * W * W /
+        (math.pi * M0 * phi * rho * S * piEA)
+    ) * (1 / (V_M * V_M) + (V_M * V_M) / (Vx ** 4))
+    return b, m
+
 def bootstrap(data):
     """ airframe and flight test data -> bootstrap data plate """
     plate = data  # TODO extract only the canonical?
     if 'A' not in data and 'B' in data and 'S' in data:
-        plate['A'] = (data['B'] ** 2 / data['S']).to('')
+        plate['A'] = lower(data['B'], 'ft') ** 2 / lower(data['S'], 'ft^2')
     if 'M0' not in data and 'P0' in data and 'n0' in data:
         # Q_(2700, 'rpm') == 2 * math.pi * Q_(2700, '1/min')
         # so we leave out the 2π factor in the denominator
@@ -103,47 +326,36 @@ def bootstrap(data):
     if 'C' not in data:
         plate['C'] = 0.12
 
+    # The fits below work on floats in ft, lbf, slug, s and rankine, so
+    # the dimensionless results come out as plain floats.
+    S = lower(plate['S'], 'ft^2')
+    A = lower(plate['A'], '')
+
     if 'drag' in data:
         # [PoLA] appendix F
         drag = data['drag']
-        h_p = drag['h_p']
-        T = drag['T']
-        sigma = relativeDensity(h_p, T)
-        dh = tapeline(drag['dh_p'], h_p, T)
-        Vbg = tas(drag['VCbg'], h_p, T)
-        gamma_bg = flightAngle(Vbg, dh, drag['dt'])
-
-        # [PoLA] eq 9.41
-        # I think there's a sign error; eq 9.41 uses -W but that gives the wrong sign.
-        rho = rho0 * sigma
-        plate['C_D0'] = drag['W'] * math.sin(gamma_bg) / (rho * plate['S'] * Vbg ** 2)
-        plate['C_D0'].ito('')
-        plate['e'] = 4 * plate['C_D0'] / (math.pi * plate['A'] * math.tan(gamma_bg) ** 2)
+        h_p = lower(drag['h_p'], 'ft')
+        T = lower(drag['T'], 'rankine')
+        sigma = _sigma(h_p, T)
+        dh = lower(drag['dh_p'], 'ft')
+        if T is not None:
+            dh = _tapeline(dh, h_p, T)
+        Vbg = lower(drag['VCbg'], 'ft/s') / math.sqrt(sigma)
+        plate['C_D0'], plate['e'] = _dragFit(
+            S, A, lower(drag['W'], 'lbf'), sigma, Vbg, dh, lower(drag['dt'], 's'))
 
     if 'thrust' in data:
         thrust = data['thrust']
-        h_p = thrust['h_p']
-        T = thrust['T']
-        rho = density(thrust['h_p'], thrust['T'])
-        phi = dropoffFactor(h_p, T)
-        d = plate['d']
-        Vx = tas(thrust['VCx'], h_p, T)
-        V_M = tas(thrust['VC_M'], h_p, T)
-        W = thrust['W']
-
-        # [Bootstrap] eq 8, [PoLA] eq 7.1
-        plate['b'] = plate['S'] * plate['C_D0'] / (2 * d * d) - (
-            2 * W * W / (rho * rho * d * d * plate['S']
-                * math.pi * plate['e'] * plate['A'] * Vx ** 4)
-        )
-        plate['b'].ito('')
-
-        # [Bootstrap] eq 9, but substituting πM0 = P0/2n0
-        plate['m'] = (d * W * W /
-            (math.pi * plate['M0'] * phi * rho * plate['S'] *
-                math.pi * plate['e'] * plate['A'])
-        ) * (1 / (V_M * V_M) + (V_M * V_M) / (Vx ** 4))
-        plate['m'].ito('')
+        h_p = lower(thrust['h_p'], 'ft')
+        T = lower(thrust['T'], 'rankine')
+        sigma = _sigma(h_p, T)
+        root_sigma = math.sqrt(sigma)
+        plate['b'], plate['m'] = _thrustFit(
+            S, A, lower(plate['d'], 'ft'), lower(plate['M0'], 'ft lbf'),
+            lower(plate['C_D0'], ''), lower(plate['e'], ''),
+            lower(thrust['W'], 'lbf'), sigma, dropoffFactor(h_p, T),
+            lower(thrust['VCx'], 'ft/s') / root_sigma,
+            lower(thrust['VC_M'], 'ft/s') / root_sigma)
 
     # mock overrides for testing
     for k in ['C_D0', 'e', 'b', 'm']:
@@ -153,88 +365,445 @@ def bootstrap(data):
     return plate
 
 
-def composites(plate, W, h_rho):
-    # We don't worry about W/W0, instead we just calculate the base
-    # composites on the fly. CPU is cheap.
-    phi = dropoffFactor(h_rho, C=plate['C'])
-    rho = density(h_rho)
-    sigma = relativeDensity(h_rho)
-
+# canonical data plate units
+_plate_units = {
+    'S': 'ft^2',
+    'A': '',
+    'M0': 'ft lbf',
+    'd': 'ft',
+    'C_D0': '',
+    'e': '',
+    'b': '',
+    'm': '',
+    'C': '',
+}
+
+class Plate(NamedTuple):
+    """ A bootstrap data plate as plain floats, in ft, lbf, slug and s.
+    composites() and performance() take either this or a plate dict. """
+    S: float
+    A: float
+    M0: float
+    d: float
+    C_D0: float
+    e: float
+    b: float
+    m: float
+    C: float
+
+    @classmethod
+    def from_dict(cls, plate):
+        """ from a plate dict, as made by bootstrap() """
+        return cls(**{k: lower(plate[k], u) for k, u in _plate_units.items()})
+
+    @property
+    def piEA(self):
+        """ π e A, the induced drag denominator """
+        return math.pi * self.e * self.A
+
+    @property
+    def rho0S(self):
+        """ ρ0 S in slug/ft """
+        return _rho0 * self.S
+
+def _asPlate(plate):
+    # A plate dict is read afresh on every call, so changes to it take.
+    # The float cores are memoized on the Plate's values, not the dict.
+    if isinstance(plate, Plate):
+        return plate
+    return Plate.from_dict(plate)
+
+def _weight(W):
+    """ W as a float, or as a float array when there are several. An int W
+    would otherwise compile the kernels a second time, for int64. """
+    return float(W) if numpy.ndim(W) == 0 else numpy.asarray(W, dtype=numpy.float64)
+
+def _altitude_factors(plate, h_rho):
+    """ dropoff factor φ and relative density σ at h_rho, from one σ """
+    sigma = _sigma(h_rho)
+    return _dropoff(sigma, plate.C), sigma
+
+def _wrap(cls, raw, units):
+    """ attach units to a dict of floats, as a cls """
+    return cls(**{k: Q_(v, units[k]) for k, v in raw.items()})
+
+class _Results:
+    """ Mapping style access for the result tuples, so y['Vy'] works as
+    well as y.Vy. Results that weren't calculated are None and left out,
+    as with the dicts these replaced: y['T'] is a KeyError without V, though
+    y.T is None. This isn't a full mapping, len() and iteration are still
+    the tuple's, over every field. """
+    __slots__ = ()
+
+    def __getitem__(self, k):
+        if isinstance(k, str):
+            if k not in self:
+                raise KeyError(k)
+            return getattr(self, k)
+        return tuple.__getitem__(self, k)
+
+    def __contains__(self, k):
+        return k in self._fields and getattr(self, k) is not None
+
+    def get(self, k, default=None):
+        return getattr(self, k) if k in self else default
+
+    def keys(self):
+        return [k for k, v in zip(self._fields, self) if v is not None]
+
+    def values(self):
+        return [v for v in self if v is not None]
+
+    def items(self):
+        return [(k, v) for k, v in zip(self._fields, self) if v is not None]
+
+_composites_units = {
+    'E': ureg.Unit('lbf'),
+    'F': ureg.Unit('slug / ft'),
+    'G0': ureg.Unit('slug / ft'),
+    'G': ureg.Unit('slug / ft'),
+    'H0': ureg.Unit('ft lbf^2 / slug'),
+    'H': ureg.Unit('ft lbf^2 / slug'),
+    'K': ureg.Unit('slug / ft'),
+    'Q': ureg.Unit('ft lbf / slug'),
+    'R': ureg.Unit('ft^2 lbf^2 / slug^2'),
+    'U': ureg.Unit('ft^2 lbf^2 / slug^2'),
+}
+
+class _CompositesTuple(NamedTuple):
+    E: Q_
+    F: Q_
+    G0: Q_
+    G: Q_
+    H0: Q_
+    H: Q_
+    K: Q_
+    Q: Q_
+    R: Q_
+    U: Q_
+
+class Composites(_Results, _CompositesTuple):
+    """ composites() results, see _composites_units """
+    __slots__ = ()
+
+class _BaseComposites(NamedTuple):
+    """ the altitude independent composites, functions of plate and W only """
+    E0: float
+    F0: float
+    G0: float
+    H0: float
+    K0: float
+    Q0: float
+    R0: float
+    U0: float
+
+# The float cores are memoized on their (hashable) float arguments. They
+# return shared dicts, so callers must copy rather than mutate them.
+def _memoized(f):
+    """ functools.lru_cache, except that calls with an array argument (a
+    weight array, say), which can't be hashed, skip the cache """
+    cached = functools.lru_cache(maxsize=1024)(f)
+    @functools.wraps(f)
+    def wrapper(*args):
+        if any(isinstance(x, numpy.ndarray) for x in args):
+            return f(*args)
+        return cached(*args)
+    return wrapper
+
+@njit(cache=True)
+def _base_composites_core(m, M0, d, b, C_D0, rho0S, piEA, W):
     # composites [Bootstrap] pg 27-28
     # substituting πM0 = P0/2n0
-    E0 = plate['m'] * plate['M0'] * 2 * math.pi / plate['d']
-    F0 = rho0 * plate['d'] ** 2 * plate['b']
-    G0 = rho0 * plate['S'] * plate['C_D0'] / 2
-    H0 = 2 * W * W / (rho0 * plate['S'] * math.pi * plate['e'] * plate['A'])
+    E0 = m * M0 * 2 * math.pi / d
+    F0 = _rho0 * d * d * b
+    G0 = rho0S * C_D0 / 2
+    H0 = 2 * W * W / (rho0S * piEA)
     K0 = F0 - G0
     Q0 = E0 / K0
     R0 = H0 / K0
     U0 = H0 / G0
-
-    return {
-        'E': phi * E0,
-        'F': sigma * F0,
-        'G0': G0,
-        'G': sigma * G0,
-        'H0': H0,
-        'H': H0 / sigma,
-        'K': sigma * K0,
-        'Q': phi * Q0 / sigma,
-        'R': R0 / (sigma * sigma),
-        'U': U0 / (sigma * sigma),
-    }
-
-
-def performance(plate, W, h_rho, V = None):
-    """ Calculate performance data given a bootstrap data plate, weight, density altitude, and optionally true(?) airspeed.
-    Airspeed is required to calculate ... """
-    c = composites(plate, W, h_rho)
-    sigma = relativeDensity(h_rho)
-    ret = {}
-
+    return E0, F0, G0, H0, K0, Q0, R0, U0
+
+@_memoized
+def _plate_base_composites(plate, W):
+    return _BaseComposites(*_base_composites_core(
+        plate.m, plate.M0, plate.d, plate.b, plate.C_D0, plate.rho0S, plate.piEA, W))
+
+@njit(cache=True)
+def _altitude_core(E0, F0, G0, H0, K0, Q0, R0, U0, phi, sigma):
+    E = phi * E0
+    F = sigma * F0
+    G = sigma * G0
+    H = H0 / sigma
+    K = sigma * K0
+    Q = phi * Q0 / sigma
+    R = R0 / (sigma * sigma)
+    U = U0 / (sigma * sigma)
+    return E, F, G0, G, H0, H, K, Q, R, U
+
+@_memoized
+def _composites_raw(plate, W, phi, sigma):
+    """ composites on floats: a Plate, W in lbf, and the dropoff factor and
+    relative density at h_rho """
+    # only the altitude factors are applied per call
+    return dict(zip(_composites_units, _altitude_core(*_plate_base_composites(plate, W), phi, sigma)))
+
+@_unitless(W='lbf', h_rho='ft')
+def composites(plate, W, h_rho):
+    """ the composites at weight W and density altitude h_rho, in lbf and
+    ft if unitless """
+    # We don't worry about W/W0: the base composites are calculated for
+    # each (plate, W) and memoized, and only the altitude factors are
+    # applied per call.
+    plate = _asPlate(plate)
+    phi, sigma = _altitude_factors(plate, h_rho)
+    return _wrap(Composites, _composites_raw(plate, _weight(W), phi, sigma), _composites_units)
+
+
+_performance_units = {
+    'V_M': ureg.Unit('ft/s'),
+    'Vm': ureg.Unit('ft/s'),
+    'Vy': ureg.Unit('ft/s'),
+    'ROC_y': ureg.Unit('ft/s'),
+    'Vx': ureg.Unit('ft/s'),
+    'Vbg': ureg.Unit('ft/s'),
+    'Vmd': ureg.Unit('ft/s'),
+    'gamma_x': ureg.Unit('radian'),
+    'ROC_md': ureg.Unit('ft/s'),
+    'ROS_md': ureg.Unit('ft/s'),
+    'gamma_bg': ureg.Unit('radian'),
+    'T': ureg.Unit('lbf'),
+    'Dp': ureg.Unit('lbf'),
+    'Di': ureg.Unit('lbf'),
+    'D': ureg.Unit('lbf'),
+    'ROC': ureg.Unit('ft/s'),
+    'Pre': ureg.Unit('ft lbf / s'),
+    'Pav': ureg.Unit('ft lbf / s'),
+    'Pxs': ureg.Unit('ft lbf / s'),
+    'Txs': ureg.Unit('lbf'),
+    'gamma': ureg.Unit('radian'),
+    'VC_M': ureg.Unit('knots'),
+    'VCm': ureg.Unit('knots'),
+    'VCy': ureg.Unit('knots'),
+    'VCx': ureg.Unit('knots'),
+    'VCbg': ureg.Unit('knots'),
+    'VCmd': ureg.Unit('knots'),
+}
+
+class _PerformanceTuple(NamedTuple):
+    V_M: Q_
+    Vm: Q_
+    Vy: Q_
+    ROC_y: Q_
+    Vx: Q_
+    Vbg: Q_
+    Vmd: Q_
+    gamma_x: Q_
+    ROC_md: Q_
+    ROS_md: Q_
+    gamma_bg: Q_
+    VC_M: Q_
+    VCm: Q_
+    VCy: Q_
+    VCx: Q_
+    VCbg: Q_
+    VCmd: Q_
+    # the rest need an airspeed
+    T: Q_ = None
+    Dp: Q_ = None
+    Di: Q_ = None
+    D: Q_ = None
+    ROC: Q_ = None
+    Pre: Q_ = None
+    Pav: Q_ = None
+    Pxs: Q_ = None
+    Txs: Q_ = None
+    gamma: Q_ = None
+
+class Performance(_Results, _PerformanceTuple):
+    """ performance() results, see _performance_units """
+    __slots__ = ()
+
+# the results of _vspeeds_core and _airspeed_core, in order
+_vspeeds_keys = ('V_M', 'Vm', 'Vy', 'ROC_y', 'Vx', 'Vbg', 'Vmd', 'gamma_x', 'ROC_md', 'gamma_bg')
+_airspeed_keys = ('T', 'Dp', 'Di', 'D', 'ROC', 'Pre', 'Pav', 'Pxs', 'Txs', 'gamma')
+
+_fourthRootOfThird = (1 / 3) ** 0.25
+
+# performance_grid runs this one elementwise too, so numpy.arcsin again.
+# numpy.sqrt gives NaN past the ceiling with or without numba, where ** 0.5
+# on a negative float would give a complex number in plain Python.
+@njit(cache=True)
+def _vspeeds_core(E, G, H, K, Q, R, U, W):
+    Q2 = Q * Q
+    disc_M = numpy.sqrt(Q2 / 4 + R)
     # [PoLA] eq 7.19
-    ret['V_M'] = (-c['Q'] / 2 + (c['Q'] ** 2 / 4 + c['R']) ** 0.5) ** 0.5
+    V_M = numpy.sqrt(-Q / 2 + disc_M)
     # [PoLA] eq 7.21
-    ret['Vm'] = (-c['Q'] / 2 - (c['Q'] ** 2 / 4 + c['R']) ** 0.5) ** 0.5
+    Vm = numpy.sqrt(-Q / 2 - disc_M)
     # [PoLA] eq 7.24
-    ret['Vy'] = (-c['Q'] / 6 + (c['Q'] ** 2 / 36 - c['R'] / 3) ** 0.5) ** 0.5
+    Vy = numpy.sqrt(-Q / 6 + numpy.sqrt(Q2 / 36 - R / 3))
     # [PoLA] eq 7.39, aka ROC_max
-    ret['ROC_y'] = (c['E'] * ret['Vy'] + c['K'] * ret['Vy'] ** 3 - c['H'] / ret['Vy']) / W
+    ROC_y = (E * Vy + K * Vy * Vy * Vy - H / Vy) / W
     # [PoLA] eq 7.27
-    ret['Vx'] = (-c['R']) ** 0.25
+    Vx = numpy.sqrt(numpy.sqrt(-R))
     # [PoLA] eq 7.31
-    ret['Vbg'] = c['U'] ** 0.25
-    # [PoLA] eq 7.33
-    ret['Vmd'] = Vmd = (c['U'] / 3) ** 0.25
-    for vspeed in ['V_M', 'Vm', 'Vy', 'Vx', 'Vbg', 'Vmd']:
-        vcspeed = 'VC' + vspeed[1:]
-        ret[vcspeed] = cas(ret[vspeed], h_rho)
+    Vbg = numpy.sqrt(numpy.sqrt(U))
+    # [PoLA] eq 7.33, (U/3)^¼
+    Vmd = Vbg * _fourthRootOfThird
 
     # eq 7.44
-    ret['gamma_x'] = numpy.arcsin((c['E'] - 2 * (-c['K'] * c['H']) ** 0.5) / W)
+    gamma_x = numpy.arcsin((E - 2 * numpy.sqrt(-K * H)) / W)
     # eq 7.48 is weird for units, so plug Vmd into eq 7.46
-    ret['ROC_md'] = (-c['G'] * Vmd ** 3 - c['H'] / Vmd) / W
-    ret['ROS_md'] = ret['ROC_md']
+    ROC_md = (-G * Vmd * Vmd * Vmd - H / Vmd) / W
     # eq 7.51
-    ret['gamma_bg'] = -numpy.arcsin(2 * (c['G'] * c['H']) ** 0.5 / W)
-
-    if V:
-        # [PoLA] eq 7.35
-        ret['T'] = T = c['E'] + c['F'] * V * V
-        # eq 7.37
-        ret['Dp'] = Dp = c['G'] * V * V
-        ret['Di'] = Di = c['H'] / (V * V)
-        ret['D'] = D = Dp + Di
-        # eq 7.39
-        ret['ROC'] = ROC = (c['E'] * V + c['K'] * V ** 3 - c['H'] / V) / W
-        # eq 7.9
-        ret['Pre'] = Pre = D * V
-        # [PoLA] eq 7.14
-        ret['Pav'] = Pav = T * V
-        # eq 7.17
-        ret['Pxs'] = Pxs = Pav - Pre
-        ret['Txs'] = T - D  # pg 192
-        # eq 7.41
-        ret['gamma'] = numpy.arcsin(ROC / V)
+    gamma_bg = -numpy.arcsin(2 * numpy.sqrt(G * H) / W)
+
+    return V_M, Vm, Vy, ROC_y, Vx, Vbg, Vmd, gamma_x, ROC_md, gamma_bg
+
+# V may be an array here (performance_vec and performance_grid), so this
+# one sticks to ** and numpy.arcsin
+@njit(cache=True)
+def _airspeed_core(E, F, G, H, K, W, V):
+    V2 = V * V
+    # [PoLA] eq 7.35
+    T = E + F * V2
+    # eq 7.37
+    Dp = G * V2
+    Di = H / V2
+    D = Dp + Di
+    # eq 7.39
+    ROC = (E * V + K * V2 * V - H / V) / W
+    # eq 7.9
+    Pre = D * V
+    # [PoLA] eq 7.14
+    Pav = T * V
+    # eq 7.17
+    Pxs = Pav - Pre
+    Txs = T - D  # pg 192
+    # eq 7.41
+    gamma = numpy.arcsin(ROC / V)
+    return T, Dp, Di, D, ROC, Pre, Pav, Pxs, Txs, gamma
+
+@_memoized
+def _vspeeds_raw(plate, W, phi, sigma):
+    """ the airspeed independent part of _performance_raw """
+    c = _composites_raw(plate, W, phi, sigma)
+    # past the ceiling some V speeds don't exist, which is NaN, not an error
+    with numpy.errstate(invalid='ignore'):
+        ret = dict(zip(_vspeeds_keys,
+            _vspeeds_core(c['E'], c['G'], c['H'], c['K'], c['Q'], c['R'], c['U'], W)))
+    ret['ROS_md'] = ret['ROC_md']
+    return ret
+
+def _performance_raw(plate, W, phi, sigma, V=None):
+    """ performance on floats: a Plate, W in lbf, the dropoff factor and
+    relative density at h_rho, and V in ft/s (or an array of them) """
+    ret = dict(_vspeeds_raw(plate, W, phi, sigma))
+
+    if V is not None:
+        c = _composites_raw(plate, W, phi, sigma)
+        ret.update(zip(_airspeed_keys,
+            _airspeed_core(c['E'], c['F'], c['G'], c['H'], c['K'], W, V)))
 
     return ret
+
+
+def performance_floats(plate, W, h_rho, V=None):
+    """ performance() without units: W in lbf, h_rho in ft and V in ft/s (or
+    an array of them). Returns a dict of floats in _performance_units.
+    A V of 0 is taken as no airspeed, as it always was. """
+    if numpy.ndim(V) == 0 and not V:
+        V = None
+    plate = _asPlate(plate)
+    phi, sigma = _altitude_factors(plate, h_rho)
+    ret = _performance_raw(plate, _weight(W), phi, sigma, V)
+
+    # cas() for all of them at once, in knots
+    cas_factor = math.sqrt(sigma) / _fps_per_knot
+    for vspeed in ['V_M', 'Vm', 'Vy', 'Vx', 'Vbg', 'Vmd']:
+        vcspeed = 'VC' + vspeed[1:]
+        ret[vcspeed] = ret[vspeed] * cas_factor
+
+    return ret
+
+# Units are stripped once on the way in and reattached once at the end; the
+# arithmetic in between is all on floats.
+@_unitless(W='lbf', h_rho='ft', V='knots')
+def performance(plate, W, h_rho, V = None):
+    """ Calculate performance data given a bootstrap data plate, weight, density altitude, and optionally true(?) airspeed.
+    Airspeed is required to calculate ...
+    W in lbf, h_rho in ft and V in knots if unitless """
+    if V is not None:
+        V = V * _fps_per_knot
+    return _wrap(Performance, performance_floats(plate, W, h_rho, V), _performance_units)
+
+def specialize(plate):
+    """ performance() with the plate fixed: returns f(W, h_rho, V=None), in
+    the same units as performance(). The plate is converted to floats once,
+    rather than on every call. """
+    return functools.partial(performance, _asPlate(plate))
+
+
+@_unitless(W='lbf', h_rho='ft', V='knots')
+def performance_vec(plate, W, h_rho, V):
+    """ performance() over a 1-D array of true airspeeds. W in lbf, h_rho in
+    ft and V in knots if unitless, as for performance().
+    The airspeed dependent results are arrays, the V speeds are scalars. """
+    V = numpy.asarray(V, dtype=numpy.float64) * _fps_per_knot
+    return _wrap(Performance, performance_floats(plate, W, h_rho, V), _performance_units)
+
+
+@njit(cache=True)
+def _grid_core(p, W, phi, sigma, V):
+    """ _vspeeds_core and _airspeed_core from the plate floats p, as packed
+    by performance_grid """
+    E0, F0, G0, H0, K0, Q0, R0, U0 = _base_composites_core(
+        p[0], p[1], p[2], p[3], p[4], p[5], p[6], W)
+    E, F, G0, G, H0, H, K, Q, R, U = _altitude_core(
+        E0, F0, G0, H0, K0, Q0, R0, U0, phi, sigma)
+    return (_vspeeds_core(E, G, H, K, Q, R, U, W) +
+        _airspeed_core(E, F, G, H, K, W, V))
+
+_grid_keys = _vspeeds_keys + _airspeed_keys
+
+if guvectorize is None:
+    # the kernels are plain NumPy without numba, so broadcasting does the job
+    _grid = _grid_core
+else:
+    @guvectorize(['void(f8[:], f8, f8, f8, f8' + ', f8[:]' * len(_grid_keys) + ')'],
+        '(k),(),(),(),()->' + ','.join(['()'] * len(_grid_keys)), cache=True)
+    def _grid(p, W, phi, sigma, V,
+            V_M, Vm, Vy, ROC_y, Vx, Vbg, Vmd, gamma_x, ROC_md, gamma_bg,
+            T, Dp, Di, D, ROC, Pre, Pav, Pxs, Txs, gamma):
+        (V_M[0], Vm[0], Vy[0], ROC_y[0], Vx[0], Vbg[0], Vmd[0], gamma_x[0], ROC_md[0], gamma_bg[0],
+            T[0], Dp[0], Di[0], D[0], ROC[0], Pre[0], Pav[0], Pxs[0], Txs[0], gamma[0]) = (
+            _grid_core(p, W, phi, sigma, V))
+
+@_unitless(W='lbf', h_rho='ft', V='knots')
+def performance_grid(plate, W, h_rho, V):
+    """ performance() over a grid of weights (lbf if unitless), density
+    altitudes (ft if unitless) and true airspeeds (knots if unitless), which
+    broadcast against each other, e.g.
+    performance_grid(plate, Ws[:, None, None], hs[:, None], vs) """
+    plate = _asPlate(plate)
+    W = numpy.asarray(W, dtype=numpy.float64)
+    h_rho = numpy.asarray(h_rho, dtype=numpy.float64)
+    V = numpy.asarray(V, dtype=numpy.float64) * _fps_per_knot
+
+    # the atmosphere kernel is scalar, so it runs once per altitude up front
+    # and only the plate math runs per grid point
+    sigma = numpy.vectorize(_standardRelativeDensity, otypes=[float])(h_rho)
+    phi = _dropoff(sigma, plate.C)
+    p = numpy.array([plate.m, plate.M0, plate.d, plate.b, plate.C_D0, plate.rho0S, plate.piEA])
+
+    # without numba the V speeds only broadcast over W and h_rho
+    shape = numpy.broadcast(W, h_rho, V).shape
+    with numpy.errstate(invalid='ignore'):
+        raw = _grid(p, W, phi, sigma, V)
+    ret = {k: numpy.broadcast_to(v, shape) for k, v in zip(_grid_keys, raw)}
+    ret['ROS_md'] = ret['ROC_md']
+    cas_factor = numpy.sqrt(sigma) / _fps_per_knot
+    for vspeed in ['V_M', 'Vm', 'Vy', 'Vx', 'Vbg', 'Vmd']:
+        ret['VC' + vspeed[1:]] = ret[vspeed] * cas_factor
+    return _wrap(Performance, ret, _performance_units)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+""" Ahead of time compile lowry's scalar atmosphere kernels into the
+lowry_native extension:
+
+    python3 lowry_aot.py
+
+lowry uses lowry_native when it's importable and its own kernels when not.
+Calls from Python go straight to native code, with no dispatcher.
+"""
+
+import os
+import sys
+
+from numba.pycc import CC
+
+# build from lowry's own kernels, not a previous lowry_native
+sys.modules['lowry_native'] = None
+import lowry
+
+cc = CC('lowry_native')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+def export(f, signature):
+    return cc.export(f.__name__, signature)(getattr(f, 'py_func', f))
+
+export(lowry._standardTemperature, 'f8(f8)')
+export(lowry._standardPressure, 'f8(f8)')
+export(lowry._relativeDensity, 'f8(f8, f8)')
+export(lowry._standardRelativeDensity, 'f8(f8)')
+export(lowry._tapeline, 'f8(f8, f8, f8)')
+
+if __name__ == '__main__':
+    cc.compile()
@@ -1,3 +1,6 @@
+import sys
+
+import numpy
 import pytest
 import lowry
 
@@ -7,8 +10,19 @@ ureg = lowry.ureg
 Q_ = ureg.Quantity
 
 def assert_approx_Q(a, b, **kwargs):
-    assert a.is_compatible_with(b)
-    assert a.m_as(b.units) == approx(b.magnitude, **kwargs)
+    # lower() caches the conversion factor per pair of units
+    if a.units != b.units:
+        assert a.dimensionality == b.dimensionality
+    assert lower(a, b.units) == approx(b.magnitude, **kwargs)
+
+def assert_performance(y, plate, W, h, V=None):
+    # y against performance(plate, ...), field by field; floats are taken to
+    # be in _performance_units
+    for k, v in lowry.performance(plate, W, h, V).items():
+        if lowry.isQuantity(y[k]):
+            assert_approx_Q(y[k], v)
+        else:
+            assert y[k] == approx(v.m_as(lowry._performance_units[k]))
 
 class TestHelpers:
     def test_lower(self):
@@ -19,17 +33,44 @@ class TestHelpers:
         assert lower(h_p, h_p.units) == h_p.magnitude
         assert lower(T, T.units) == T.magnitude
         assert lower(T.magnitude, T.units) == T.magnitude
+        assert lower(h_p, 'm') == approx(1752.6)
+        assert lower(T, 'rankine') == approx(504.67)
+
+    def test_unitless_arguments(self):
+        with pytest.raises(TypeError):
+            lowry.relativeDensity(5750, None, 5)
+        with pytest.raises(TypeError):
+            lowry.performance(plate71, 1800, 8000, 75, 1)
+        assert lowry.relativeDensity(h=Q_(0, 'ft')) == 1.0
 
 class TestAtmosphere:
     def test_standardTemperature(self):
-        assert_approx_Q(lowry.standardTemperature(Q_('36090 ft')), Q_(-56.5, 'degC'), abs=0.1)
+        assert_approx_Q(lowry.standardTemperature(Q_(36090, 'ft')), Q_(-56.5, 'degC'), abs=0.1)
 
     def test_relativeDensity(self):
-        assert lowry.relativeDensity(Q_('5000 ft')) == approx(0.86414, rel=1e-2)
+        assert lowry.relativeDensity(Q_(5000, 'ft')) == approx(0.86414, rel=1e-2)
         h_p = Q_(5750, 'ft')
         T = Q_(45, 'degF')
         assert lowry.relativeDensity(h_p, T) == approx(0.833785193, 1e-3)
 
+    def test_relativeDensity_vec(self):
+        hs = Q_([0, 5000, 20000, 36000], 'ft')
+        assert lowry.relativeDensity_vec(hs) == approx([lowry.relativeDensity(h) for h in hs])
+        # above the tropopause
+        assert lowry.relativeDensity_vec(Q_([50000, 65617], 'ft')) == approx([0.1527, 0.0721], rel=1e-2)
+
+    def test_native_check(self, monkeypatch):
+        import types
+        native = types.ModuleType('lowry_native')
+        for name in ['_standardTemperature', '_standardPressure', '_relativeDensity',
+                '_standardRelativeDensity', '_tapeline']:
+            setattr(native, name, getattr(lowry, name))
+        monkeypatch.setitem(sys.modules, 'lowry_native', native)
+        assert lowry._loadNative() is not None
+        # a stale build, say rho0 changed since
+        native._relativeDensity = lambda h, T: 1.001 * lowry._relativeDensity(h, T)
+        assert lowry._loadNative() is None
+
     def test_density(self):
         h_p = Q_(5750, 'ft')
         T = Q_(45, 'degF')
@@ -38,17 +79,17 @@ class TestAtmosphere:
     def test_tas(self):
         # The figures from appendix F are wrong. :/
         # This matches what many online calculators and my E6B say
-        V_cas = Q_('70.5 kts')
-        V_tas = Q_('77 kts')
-        h_p = Q_('5750 ft')
+        V_cas = Q_(70.5, 'kts')
+        V_tas = Q_(77, 'kts')
+        h_p = Q_(5750, 'ft')
         T = Q_(45, 'degF')
         assert_approx_Q(lowry.tas(V_cas, h_p, T), V_tas, abs=1)
         assert_approx_Q(lowry.cas(V_tas, h_p, T), V_cas, abs=1)
 
     def test_tapeline(self):
-        dt = Q_('39.10 s')
-        dh = Q_('500 ft')
-        h_p = Q_('5750 ft')
+        dt = Q_(39.10, 's')
+        dh = Q_(500, 'ft')
+        h_p = Q_(5750, 'ft')
         T = Q_(45, 'degF')
         V = Q_(119.8, 'ft/s')  # his TAS calculation is wrong so just use his result
         tapeline = lowry.tapeline(dh, h_p, T)
@@ -56,20 +97,34 @@ class TestAtmosphere:
 
         assert_approx_Q(tapeline, Q_(506.5, 'ft'), abs=0.1)
         assert_approx_Q(gamma, Q_(6.21, 'deg'), abs=0.01)
+        # an array of deltas, with or without numba
+        tapelines = lowry.tapeline(Q_([500, 600], 'ft'), h_p, T)
+        assert tapelines.units == dh.units
+        assert_approx_Q(tapelines[0], tapeline)
+        assert_approx_Q(tapelines[1], lowry.tapeline(Q_(600, 'ft'), h_p, T))
+        assert lowry.tapeline(numpy.array([500, 600]), 5750, 504.67) == approx(tapelines.m)
+
+        segment = lowry.climbSegment(h_p, T, V, dh, dt)
+        assert_approx_Q(segment[0], tapeline)
+        assert_approx_Q(segment[1], gamma)
+        assert_approx_Q(lowry.climbSegment(h_p, None, V, dh, dt)[0], dh)
 
 # [PoLA] table 7.1
 plate71 = {
-    'S': Q_('174 ft^2'),
+    'S': Q_(174, 'ft^2'),
     'A': 7.38,
-    'M0': Q_('311.2 ft lbf'),
+    'M0': Q_(311.2, 'ft lbf'),
     'C': 0.12,
-    'd': Q_('6.25 ft'),
+    'd': Q_(6.25, 'ft'),
     'C_D0': 0.037,
     'e': 0.72,
     'm': 1.70,
     'b': -0.0564,
 }
 
+# and as floats in ft, lbf, slug and s
+plate71_floats = lowry.Plate.from_dict(plate71)
+
 class TestBootstrap:
     def donot_test_appendixF(self):
         # BAH he screws up the sigma calculation and this is all for naught. But
@@ -77,24 +132,24 @@ class TestBootstrap:
         # hand-calculated version.
 
         data = {
-            'S': Q_('174 ft^2'),
-            'B': Q_('35.83 ft'),
-            'P0': Q_('160 horsepower'),
-            'n0': Q_('2700 rpm'),
+            'S': Q_(174, 'ft^2'),
+            'B': Q_(35.83, 'ft'),
+            'P0': Q_(160, 'horsepower'),
+            'n0': Q_(2700, 'rpm'),
             # C: 0.12,
-            'd': Q_('6.25 ft'),
+            'd': Q_(6.25, 'ft'),
             'drag': {
-                'W': Q_('2200 lbf'),
-                'dh_p': Q_('200 ft'),
-                'VCbg': Q_('70 kts'),
-                'dt': Q_('17.0 sec'),
+                'W': Q_(2200, 'lbf'),
+                'dh_p': Q_(200, 'ft'),
+                'VCbg': Q_(70, 'kts'),
+                'dt': Q_(17.0, 'sec'),
 
-                'W': Q_('2209 lbf'),
-                'h_p': Q_('5750 ft'),
+                'W': Q_(2209, 'lbf'),
+                'h_p': Q_(5750, 'ft'),
                 'T': Q_(45, 'degF'),
-                'VCbg': Q_('70.5 kts'),
-                'dh_p': Q_('500 ft'),
-                'dt': Q_('39.10 s'),
+                'VCbg': Q_(70.5, 'kts'),
+                'dh_p': Q_(500, 'ft'),
+                'dt': Q_(39.10, 's'),
             }
         }
 
@@ -111,9 +166,9 @@ class TestBootstrap:
         Vbg = lowry.tas(VCbg, h_p, T)
         assert_approx_Q(Vbg, Q_(119.8, 'ft/s'), abs=0.1)
 
-        dh_p = Q_('500 ft')
+        dh_p = Q_(500, 'ft')
         dh = lowry.tapeline(dh_p, h_p, T)
-        assert_approx_Q(dh, Q_('506.5 ft'), abs=0.1)
+        assert_approx_Q(dh, Q_(506.5, 'ft'), abs=0.1)
         assert_approx_Q(lowry.flightAngle(Vbg, dh, dt), Q_(6.21, 'deg'), abs=0.01)
 
         plate = lowry.bootstrap(data)
@@ -125,8 +180,8 @@ class TestBootstrap:
     def test_composites0(self):
         """ see [PoLA] table 7.3, but hand calculated """
         # mock the precise data plate from table 7.1, to avoid compounding error
-        W = Q_('2400 lbf')
-        h_rho = Q_('0 ft')
+        W = Q_(2400, 'lbf')
+        h_rho = Q_(0, 'ft')
         c = lowry.composites(plate71, W, h_rho)
 
         assert lowry.relativeDensity(h_rho) == approx(1)
@@ -143,13 +198,12 @@ class TestBootstrap:
     def test_composites_at_altitude(self):
         """ see [PoLA] table 7.3, but hand calculated """
         # mock the precise data plate from table 7.1, to avoid compounding error
-        W = Q_('1800 lbf')
-        h_rho = Q_('8000 ft')
+        W = Q_(1800, 'lbf')
+        h_rho = Q_(8000, 'ft')
         c = lowry.composites(plate71, W, h_rho)
 
         assert lowry.relativeDensity(h_rho) == approx(0.7860, rel=1e-2)
         assert lowry.dropoffFactor(h_rho) == approx(0.7568, rel=1e-2)
-        print(c)
         assert_approx_Q(c['E'], Q_(402.53, 'lbf'), rel=1e-2)
         assert_approx_Q(c['F'], Q_(-0.004116, 'slug / ft'), rel=1e-3)
         assert_approx_Q(c['G'], Q_(0.0059965, 'slug / ft'), rel=1e-2)
@@ -166,9 +220,9 @@ class TestBootstrap:
 
     def test_table74(self):
         # [PoLA] table 7.5
-        h = Q_('0 ft')
-        V = Q_('75 kts')
-        y = lowry.performance(plate71, Q_('2400 lbf'), h, V)
+        h = Q_(0, 'ft')
+        V = Q_(75, 'kts')
+        y = lowry.performance(plate71, Q_(2400, 'lbf'), h, V)
         assert_approx_Q(lowry.cas(y['V_M'], h), Q_(115.4,   'kts'),    rel=1e-3)
         assert_approx_Q(lowry.cas(y['Vm'], h), Q_(34.7,    'kts'),    rel=1e-3)
         assert_approx_Q(lowry.cas(y['Vy'], h),  Q_(75.961,  'kts'),    rel=1e-3)
@@ -180,9 +234,9 @@ class TestBootstrap:
         assert_approx_Q(lowry.cas(y['Vmd'], h), Q_(54.788,  'kts'),    rel=1e-4)
         assert_approx_Q(y['ROC_md'],            Q_(-602.3,  'ft/min'), rel=1e-2)
 
-        h = Q_('8000 ft')
+        h = Q_(8000, 'ft')
         V = lowry.tas(V, h)
-        y = lowry.performance(plate71, Q_('1800 lbf'), h, V)
+        y = lowry.performance(plate71, Q_(1800, 'lbf'), h, V)
         assert_approx_Q(lowry.cas(y['V_M'], h), Q_(100.4,  'kts'),    rel=1e-2)
         assert_approx_Q(lowry.cas(y['Vm'], h), Q_(29.8,   'kts'),    rel=1e-2)
         assert_approx_Q(lowry.cas(y['Vy'], h),  Q_(65.9,   'kts'),    rel=1e-2)
@@ -197,9 +251,9 @@ class TestBootstrap:
 
     def test_table75(self):
         # [PoLA] table 7.5 (with corrections)
-        h = Q_('0 ft')
-        V = Q_('75 kts')
-        y = lowry.performance(plate71, Q_('2400 lbf'), h, V)
+        h = Q_(0, 'ft')
+        V = Q_(75, 'kts')
+        y = lowry.performance(plate71, Q_(2400, 'lbf'), h, V)
         assert_approx_Q(y['T'],     Q_(448.18, 'lbf'       ), rel=1e-2)
         assert_approx_Q(y['Pav'],   Q_(103.15, 'horsepower'), rel=1e-2)
         assert_approx_Q(y['Dp'],    Q_(122.25, 'lbf'       ), rel=1e-2)
@@ -211,8 +265,8 @@ class TestBootstrap:
         assert_approx_Q(y['Txs'],   Q_(221.49, 'lbf'       ), rel=1e-2)
         assert_approx_Q(y['gamma'], Q_(5.2956, 'deg'       ), rel=1e-2)
 
-        h = Q_('8000 ft')
-        y = lowry.performance(plate71, Q_('1800 lbf'), h, V)
+        h = Q_(8000, 'ft')
+        y = lowry.performance(plate71, Q_(1800, 'lbf'), h, V)
         assert_approx_Q(y['T'],     Q_(336.55, 'lbf'       ), rel=1e-2)
         assert_approx_Q(y['Pav'],   Q_(77.460, 'horsepower'), rel=1e-2)
         assert_approx_Q(y['Dp'],    Q_(96.088, 'lbf'       ), rel=1e-2)
@@ -223,3 +277,132 @@ class TestBootstrap:
         assert_approx_Q(y['ROC'],   Q_(699.29, 'ft/min'    ), rel=1e-2)
         assert_approx_Q(y['Txs'],   Q_(165.72, 'lbf'       ), rel=1e-2)
         assert_approx_Q(y['gamma'], Q_(5.2826, 'deg'       ), rel=1e-2)
+
+    def test_plate(self):
+        plate = plate71_floats
+        assert plate.S == 174
+        assert plate.M0 == approx(311.2)
+        W = Q_(1800, 'lbf')
+        h = Q_(8000, 'ft')
+        V = Q_(75, 'kts')
+        assert_performance(lowry.performance(plate, W, h, V), plate71, W, h, V)
+
+    def test_plate_dict_changes(self):
+        W = Q_(1800, 'lbf')
+        h = Q_(8000, 'ft')
+        plate = lowry.bootstrap(dict(plate71))
+        before = lowry.performance(plate, W, h)['Vy']
+        plate['C_D0'] = 0.05
+        after = lowry.performance(plate, W, h)['Vy']
+        assert_approx_Q(after, lowry.performance(dict(plate71, C_D0=0.05), W, h)['Vy'])
+        assert after.m_as('ft/s') != approx(before.m_as('ft/s'))
+
+    def test_performance_floats(self):
+        y = lowry.performance_floats(plate71_floats, 1800, 8000, lower(Q_(75, 'kts'), 'ft/s'))
+        assert_performance(y, plate71, Q_(1800, 'lbf'), Q_(8000, 'ft'), Q_(75, 'kts'))
+
+    def test_weight_array(self):
+        Ws = Q_([1800, 2000], 'lbf')
+        h = Q_(8000, 'ft')
+        V = Q_(75, 'kts')
+        c = lowry.composites(plate71, Ws, h)
+        ys = lowry.performance(plate71, Ws, h, V)
+        for i, W in enumerate(Ws):
+            assert_approx_Q(c['H'][i], lowry.composites(plate71, W, h)['H'])
+            y = lowry.performance(plate71, W, h, V)
+            for k in ['Vy', 'ROC_y', 'gamma_x', 'VCbg', 'ROC', 'gamma']:
+                assert_approx_Q(ys[k][i], y[k])
+
+    def test_unitless(self):
+        y = lowry.performance(plate71, Q_(1800, 'lbf'), Q_(8000, 'ft'), Q_(75, 'kts'))
+        for ys in [lowry.performance(plate71, 1800, 8000, 75),
+                lowry.performance_vec(plate71, 1800, 8000, [75]),
+                lowry.performance_grid(plate71, 1800, 8000, [75])]:
+            assert_approx_Q(ys['ROC'].reshape(()), y['ROC'])
+            assert_approx_Q(ys['Vy'].reshape(()), y['Vy'])
+        V = Q_(119.8, 'ft/s')
+        # bare airspeeds are ft/s here, as for performance_floats()
+        assert_approx_Q(lowry.flightAngle(119.8, 506.5, 39.1),
+            lowry.flightAngle(V, Q_(506.5, 'ft'), Q_(39.1, 's')))
+        assert_approx_Q(lowry.flightAngle(119.8, 506.5, 39.1), Q_(6.21, 'deg'), abs=0.01)
+        assert_approx_Q(lowry.climbSegment(5750, 504.67, 119.8, 500, 39.1)[1],
+            lowry.climbSegment(Q_(5750, 'ft'), Q_(504.67, 'rankine'), V, Q_(500, 'ft'), Q_(39.1, 's'))[1])
+
+    def test_zero_airspeed(self):
+        # no airspeed, whatever W's type
+        y = lowry.performance(plate71, 1800, 0, 0.0)
+        assert 'T' not in y and 'Di' not in y
+        assert_performance(y, plate71, 1800.0, 0)
+        assert_performance(lowry.performance_floats(plate71, 1800, 0, 0), plate71, 1800, 0)
+
+    def test_above_ceiling(self):
+        # V_M and Vm don't exist past the ceiling, with or without numba
+        y = lowry.performance(plate71, Q_(2400, 'lbf'), Q_(22000, 'ft'))
+        assert numpy.isnan(y['V_M'].m_as('ft/s'))
+        assert numpy.isnan(y['Vm'].m_as('ft/s'))
+        assert numpy.isfinite(y['Vbg'].m_as('ft/s'))
+
+    def test_results(self):
+        W = Q_(1800, 'lbf')
+        h = Q_(8000, 'ft')
+        c = lowry.composites(plate71, W, h)
+        assert c.E is c['E']
+        y = lowry.performance(plate71, W, h)
+        assert y.Vy is y['Vy']
+        assert 'Vy' in y and 'T' not in y
+        assert 'count' not in y and '_fields' not in y
+        assert y.get('T') is None and y.get('Vy') is y.Vy
+        with pytest.raises(KeyError):
+            y['T']
+        with pytest.raises(KeyError):
+            y['count']
+        assert 'T' in lowry.performance(plate71, W, h, Q_(75, 'kts')).keys()
+
+    def test_specialize(self):
+        W = Q_(1800, 'lbf')
+        h = Q_(8000, 'ft')
+        V = Q_(75, 'kts')
+        # a hand built plate dict, not one from bootstrap()
+        plate = dict(plate71)
+        f = lowry.specialize(plate)
+        assert_performance(f(W, h, V), plate71, W, h, V)
+        # specialize() takes the plate as it was when called
+        plate['C_D0'] = 0.05
+        assert_performance(f(W, h, V), plate71, W, h, V)
+        g = lowry.specialize(plate)
+        assert_performance(g(W, h, V), dict(plate71, C_D0=0.05), W, h, V)
+        assert g(W, h, V)['D'].m_as('lbf') != approx(f(W, h, V)['D'].m_as('lbf'))
+
+    def test_performance_vec(self):
+        h = Q_(8000, 'ft')
+        W = Q_(1800, 'lbf')
+        vs = Q_([60, 75, 90], 'kts')
+        ys = lowry.performance_vec(plate71, W, h, vs)
+        for i, V in enumerate(vs):
+            y = lowry.performance(plate71, W, h, V)
+            for k in ['T', 'Pav', 'D', 'Pxs', 'ROC', 'gamma']:
+                assert_approx_Q(ys[k][i], y[k], rel=1e-9)
+            assert_approx_Q(ys['Vy'], y['Vy'], rel=1e-9)
+        assert ys['Pav'].m_as('horsepower') == approx(
+            lowry.performance_vec(plate71, W, h, vs.m)['Pav'].m_as('horsepower'))
+
+    def test_performance_grid(self):
+        W = Q_(1800, 'lbf')
+        hs = Q_([0, 8000], 'ft')
+        vs = Q_([60, 75, 90], 'kts')
+        ys = lowry.performance_grid(plate71, W, hs[:, None], vs)
+        assert ys['ROC'].shape == (2, 3)
+        for i, h in enumerate(hs):
+            for j, V in enumerate(vs):
+                y = lowry.performance(plate71, W, h, V)
+                for k in ['T', 'Pav', 'D', 'Pxs', 'ROC', 'gamma']:
+                    assert_approx_Q(ys[k][i, j], y[k], rel=1e-9)
+
+        Ws = Q_([1800, 2400], 'lbf')
+        ys = lowry.performance_grid(plate71, Ws[:, None, None], hs[:, None], vs)
+        assert ys['Vy'].shape == (2, 2, 3)
+        for i, W in enumerate(Ws):
+            for j, h in enumerate(hs):
+                y = lowry.performance(plate71, W, h, vs[1])
+                for k in ['Vy', 'ROC_y', 'VCx', 'gamma_bg', 'ROC', 'Pxs']:
+                    assert_approx_Q(ys[k][i, j, 1], y[k], rel=1e-9)